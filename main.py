@@ -4,6 +4,14 @@ import time
 import random
 import sys
 import re
+import math
+import asyncio
+import threading
+import logging
+import logging.handlers
+from collections import OrderedDict, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dotenv import load_dotenv
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -14,23 +22,221 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException,
 from selenium.webdriver.common.action_chains import ActionChains
 from datetime import datetime, timedelta
 import google.generativeai as genai
+import google.ai.generativelanguage as glm
 import google.api_core.exceptions
 from urllib.parse import quote
 
 # Load environment variables
 load_dotenv()
 
+# Status lines from the monitor loop and the actions and generations it drives are buffered
+# and written in batches, in order; warnings flush immediately
+log = logging.getLogger("bot")
+_log_stream_handler = logging.StreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(logging.Formatter('%(message)s'))
+_log_buffer = logging.handlers.MemoryHandler(capacity=64, flushLevel=logging.WARNING, target=_log_stream_handler)
+log.addHandler(_log_buffer)
+log.setLevel(logging.INFO)
+log.propagate = False
+
+# --- Element locators ---
+TWEET_LOC = (By.CSS_SELECTOR, 'article[data-testid="tweet"]')
+TWEET_TEXT_LOC = (By.CSS_SELECTOR, '[data-testid="tweetText"]')
+HOME_LINK_LOC = (By.CSS_SELECTOR, 'a[data-testid="AppTabBar_Home_Link"]')
+USERNAME_INPUT_LOC = (By.CSS_SELECTOR, 'input[autocomplete="username"]')
+NEXT_BUTTON_LOC = (By.XPATH, "//span[contains(text(), 'Next')]")
+PASSWORD_INPUT_LOC = (By.CSS_SELECTOR, 'input[name="password"]')
+LOGIN_BUTTON_LOC = (By.CSS_SELECTOR, 'div[data-testid="LoginForm_Login_Button"]')
+VERIFICATION_INPUT_LOC = (By.CSS_SELECTOR, 'input[data-testid="ocfEnterTextTextInput"]')
+LIKE_BUTTON_LOC = (By.CSS_SELECTOR, '[data-testid="like"]')
+REPLY_BUTTON_LOC = (By.CSS_SELECTOR, '[data-testid="reply"]')
+RETWEET_BUTTON_LOC = (By.CSS_SELECTOR, '[data-testid="retweet"]')
+RETWEET_CONFIRM_LOC = (By.CSS_SELECTOR, '[data-testid="retweetConfirm"]')
+QUOTE_OPTION_LOC = (By.XPATH, "//span[contains(text(), 'Quote') or contains(text(), '인용')]")
+TWEET_TEXTAREA_LOC = (By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]')
+TWEET_BUTTON_LOC = (By.CSS_SELECTOR, '[data-testid="tweetButton"]')
+
+# URLs, mentions and hashtags are stripped before language detection
+_STRIP_RE = re.compile(r'http\S+|www\S+|@\w+|#\w+')
+
+# Older versions stored full status URLs; only the numeric ID is kept now
+_STATUS_ID_RE = re.compile(r'/status/(\d+)')
+
+# Number of most recently seen tweet IDs kept for deduplication
+MAX_PROCESSED_TWEETS = 300
+KEYWORD_ATTEMPTS = 2
+ACTIONS = ("reply", "quote")
+# Idle scroll count by number of consecutive empty polls
+SCROLL_LUT = tuple(min(5 + i, 15) for i in range(64))
+
+# Gemini errors that mean the current API key is unusable for now
+_CRITICAL_API_ERROR_RE = re.compile(r'quota|billing|429|api key|permission denied')
+
+# Typing-delay category per character; everything else is 'normal'
+_CHAR_KIND = {' ': 'space', '\n': 'newline', **{c: 'punctuation' for c in '.,!?'}}
+
+# Anything outside ASCII and Hangul syllables is removed from Korean replies
+_UNSUPPORTED_CHARS_RE = re.compile(r'[^\x00-\x7f\uac00-\ud7a3]+')
+
+# Installed on every new document via CDP: queues tweet articles as Twitter renders them,
+# so polls only look at tweets that appeared since the previous poll.
+_TWEET_OBSERVER_JS = """
+window.__newTweets = new Set();
+new MutationObserver(mutations => {
+    for (const mutation of mutations) {
+        for (const node of mutation.addedNodes) {
+            if (node.nodeType !== Node.ELEMENT_NODE) continue;
+            if (node.matches('article[data-testid="tweet"]')) window.__newTweets.add(node);
+            node.querySelectorAll('article[data-testid="tweet"]').forEach(a => window.__newTweets.add(a));
+        }
+    }
+}).observe(document, {childList: true, subtree: true});
+"""
+
+# Collects ID, text, visibility, authorship and reply status of tweets in one round trip. Drains the
+# observer queue when it is installed (tweets not yet laid out stay queued), otherwise scans
+# every rendered tweet. arguments[0] is the lowercased username of our own account.
+_TWEET_BATCH_JS = """
+const pending = window.__newTweets;
+let articles;
+if (pending) {
+    articles = Array.from(pending).filter(a => a.isConnected);
+    pending.clear();
+} else {
+    articles = Array.from(document.querySelectorAll('article[data-testid="tweet"]'));
+}
+return articles.map(a => {
+    const rect = a.getBoundingClientRect();
+    const visible = rect.width > 0 && rect.height > 0;
+    const name = a.querySelector('[data-testid="User-Name"]');
+    const link = a.querySelector('time')?.parentElement;
+    if (pending && !(visible && link)) pending.add(a);
+    return {
+        el: a,
+        id: link?.getAttribute('href')?.match(/\\/status\\/(\\d+)/)?.[1] || null,
+        text: a.querySelector('[data-testid="tweetText"]')?.innerText ?? null,
+        visible: visible,
+        own: !name || name.innerText.toLowerCase().includes(arguments[0]),
+        reply: !!a.querySelector('[data-testid="socialContext"]'),
+    };
+});
+"""
+
+# Prompt templates; filled with str.format(tweet_text=..., keywords_text=...)
+_REPLY_PROMPT_KR = '\n\n트윗 내용: "{tweet_text}"{keywords_text}\n\n너의 한국어 답변:'
+_REPLY_PROMPT_EN = 'You are a friendly 20-something Korean guy commenting on Twitter. Respond in casual English to this tweet. Tweet: "{tweet_text}"{keywords_text}\n\nYour English reply:'
+_QUOTE_PROMPT_KR = '\n\n인용할 트윗 내용: "{tweet_text}"{keywords_text}\n\n너의 한국어 인용 코멘트:'
+_QUOTE_PROMPT_EN = 'You are a friendly 20-something Korean guy quoting a tweet. Write a casual English comment for this tweet. Tweet to quote: "{tweet_text}"{keywords_text}\n\nYour English quote comment:'
+
+def _escape_braces(text):
+    """Escape user-provided text so it can be embedded in a str.format template."""
+    return text.replace('{', '{{').replace('}', '}}')
+
+def _status_id(tweet_id):
+    """Reduce a stored tweet identifier (status URL or bare ID) to its numeric status ID."""
+    match = _STATUS_ID_RE.search(tweet_id)
+    return match.group(1) if match else tweet_id
+
+def _sample_positions(n, probability, start=0):
+    """Pick the indices in [start, n) that would each fire independently with the given probability.
+
+    Draws geometric gaps between hits, so it costs one random() call per hit instead of one per index.
+    """
+    positions = set()
+    log_miss = math.log(1.0 - probability)
+    i = start - 1
+    while True:
+        i += int(math.log(1.0 - random.random()) / log_miss) + 1
+        if i >= n:
+            return positions
+        positions.add(i)
+
+class TokenBucket:
+    """Thread-safe token bucket holding up to capacity tokens, refilled continuously at refill_rate per second."""
+    def __init__(self, capacity, refill_rate):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.refill_rate)
+        self._last_refill = now
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def consume(self, tokens=1):
+        """Take tokens if enough are available; returns whether they were taken."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def time_until_available(self, tokens=1):
+        """Seconds until the given number of tokens can be consumed."""
+        with self._lock:
+            self._refill()
+            return max(0.0, (tokens - self._tokens) / self.refill_rate)
+
+class ActionRateLimiter:
+    """Leaky-bucket rate limiter for asyncio code.
+
+    Up to max_rate acquisitions go through immediately; after that the bucket drains at
+    max_rate per time_period and further acquisitions wait only as long as needed.
+    """
+    def __init__(self, max_rate, time_period=60):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._drain_rate = max_rate / time_period
+        self._level = 0.0
+        self._last_drain = time.monotonic()
+
+    def _drain(self):
+        now = time.monotonic()
+        self._level = max(0.0, self._level - (now - self._last_drain) * self._drain_rate)
+        self._last_drain = now
+
+    async def acquire(self):
+        while True:
+            self._drain()
+            if self._level + 1 <= self.max_rate:
+                self._level += 1
+                return
+            await asyncio.sleep((self._level + 1 - self.max_rate) / self._drain_rate)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
 class TwitterBot:
     def __init__(self):
         self.username = os.getenv('TWITTER_USERNAME')
         self.password = os.getenv('TWITTER_PASSWORD')
+        # Lowercased once for the own-tweet filter that runs on every poll
+        self._own_username_lc = (self.username or '').lower()
         self.cookies_file = os.getenv('COOKIES_FILE')
         self.community_url = os.getenv('COMMUNITY_URL')
+        self._script_dir = os.path.dirname(os.path.abspath(__file__))
         # Set Chrome profile path to a custom directory
-        self.chrome_profile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chrome_profile')
+        self.chrome_profile = os.path.join(self._script_dir, 'chrome_profile')
         
-        # Processed tweets file for persistence
-        self.processed_tweets_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'processed_tweets.json')
+        # Processed tweets file for persistence (append-only JSON Lines, compacted periodically)
+        self.processed_tweets_file = os.path.join(self._script_dir, 'processed_tweets.jsonl')
+        self.legacy_processed_tweets_file = os.path.join(self._script_dir, 'processed_tweets.json')
+        self.processed_log_lines = 0
+        self._processed_log = None # Line-buffered append handle, opened on first write
+        # Bounded LRU of tweet IDs: True once processed, False while in flight; oldest entries are evicted first
+        self.processed_tweets = OrderedDict()
         
         # Bot stop flag
         self.bot_should_stop = False
@@ -51,15 +257,49 @@ class TwitterBot:
         if not self.gemini_api_keys:
             raise ValueError("No valid GEMINI_API_KEY found after parsing. Please check your .env file.")
             
-        self.current_api_key_index = 0
-        self.configure_gemini()
-        print(f"✅ Loaded {len(self.gemini_api_keys)} Gemini API Key(s). Starting with key #1.")
+        # Each key gets a token bucket sized to its per-minute request quota; requests go to the key
+        # with the most tokens left. A key that hits a quota/auth error sits out for a while.
+        self.gemini_rpm = int(os.getenv('GEMINI_RPM') or 15)
+        self._api_key_buckets = [TokenBucket(self.gemini_rpm, self.gemini_rpm / 60) for _ in self.gemini_api_keys]
+        self.api_key_cooldown_seconds = 60
+        self._api_key_cooldown_until = [0.0] * len(self.gemini_api_keys)
+        self._api_key_lock = threading.Lock()
+        self._models = [self._build_gemini_model(key) for key in self.gemini_api_keys]
+        # A request still running after gemini_hedge_seconds is hedged with a second key
+        self.gemini_hedge_seconds = 4
+        self._gemini_pool = ThreadPoolExecutor(max_workers=min(8, 2 * len(self.gemini_api_keys)))
+        print(f"✅ Loaded {len(self.gemini_api_keys)} Gemini API Key(s) at {self.gemini_rpm} requests/minute each.")
         # --- [END MODIFIED] ---
         
         # Load GEMINI system prompt from .env
         self.system_prompt = os.getenv('GEMINI_SYSTEM_PROMPT', '').strip()
         if not self.system_prompt:
             raise ValueError("GEMINI_SYSTEM_PROMPT is missing in .env")
+        quote_prompt = os.getenv('GEMINI_QUOTE_PROMPT', '').strip() or self.system_prompt
+        self._reply_prompt_kr = _escape_braces(self.system_prompt) + _REPLY_PROMPT_KR
+        self._quote_prompt_kr = _escape_braces(quote_prompt) + _QUOTE_PROMPT_KR
+        
+        # Gemini calls for upcoming tweets run here while the browser is busy with the current one.
+        # Only AI generation is submitted; all Selenium work stays on the main thread.
+        self._ai_executor = ThreadPoolExecutor(max_workers=3)
+        self._prefetched = {}
+        # The monitor loop is asyncio-based; the WebDriver is not thread-safe, so every Selenium
+        # call is funnelled through this single worker thread
+        self._driver_executor = ThreadPoolExecutor(max_workers=1)
+        # Replies and quotes are paced by a leaky bucket instead of a fixed wait between tweets
+        self.max_actions_per_minute = 4
+        self.action_limiter = ActionRateLimiter(self.max_actions_per_minute, 60)
+        # Idle polls back off exponentially (with full jitter) up to the cap; a gentle base keeps
+        # the bot responsive when tweets start arriving again
+        self.poll_backoff_base = 1.3
+        self.poll_backoff_cap = 30
+        # New tweets are queued by the feed poller and handled by action workers
+        self.tweet_queue_size = 32
+        self.action_workers = 1
+        
+        # Bot-scoped generator plus a pool of pre-drawn unit uniforms for the delay helpers
+        self._rng = random.Random()
+        self._uniform_pool = iter(())
         
         # --- [MODIFIED] Dynamic typing speed variables - 1500-2000 CPM (0.03-0.04s) ---
         self.current_typing_speed = random.uniform(0.03, 0.04)
@@ -70,42 +310,78 @@ class TwitterBot:
         
         self.setup_driver()
 
-    # --- [NEW] Method to configure Gemini with the current key ---
-    def configure_gemini(self):
-        """Configures the Gemini AI with the current API key."""
-        try:
-            current_key = self.gemini_api_keys[self.current_api_key_index]
-            genai.configure(api_key=current_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash') # Use the latest efficient model
-            print(f"🔄 Gemini AI configured with API Key #{self.current_api_key_index + 1}")
-        except Exception as e:
-            print(f"🚨 Failed to configure Gemini with API Key #{self.current_api_key_index + 1}: {e}")
-            self.bot_should_stop = True
+    @property
+    def required_keywords(self):
+        return self._required_keywords
 
-    # --- [NEW] Method to switch to the next API key ---
-    def switch_to_next_api_key(self):
-        """Switches to the next available Gemini API key."""
-        print(f"🚨 Critical API error with Key #{self.current_api_key_index + 1}.")
-        
-        if len(self.gemini_api_keys) <= 1:
-            print("🛑 Only one API key is available. Cannot switch. Stopping bot.")
-            self.bot_should_stop = True
-            return False
+    @required_keywords.setter
+    def required_keywords(self, keywords):
+        self._required_keywords = list(keywords)
+        # One optional lookahead per keyword: a single match() from the start of the text
+        # reports every keyword that occurs anywhere in it, overlapping ones included
+        self._required_kw_re = re.compile(
+            ''.join(f'(?=(?:.*?({re.escape(kw)}))?)' for kw in self._required_keywords), re.S | re.I
+        ) if self._required_keywords else None
+        # Matches only when every keyword is present; used to accept or retry generated text
+        self._all_kw_re = re.compile(
+            ''.join(f'(?=.*{re.escape(kw)})' for kw in self._required_keywords), re.S | re.I
+        ) if self._required_keywords else None
+        self._keywords_prompt = f"\n\nIMPORTANT: You must naturally include these keywords: {', '.join(self._required_keywords)}" if self._required_keywords else ""
 
-        self.current_api_key_index = (self.current_api_key_index + 1) % len(self.gemini_api_keys)
-        print(f"⏳ Switching to next API Key (#{self.current_api_key_index + 1}/{len(self.gemini_api_keys)})...")
-        self.configure_gemini()
-        time.sleep(1) # Brief pause after switching
-        return True
+    @property
+    def current_keyword(self):
+        return self._current_keyword
+
+    @current_keyword.setter
+    def current_keyword(self, keyword):
+        self._current_keyword = keyword
+        self._current_keyword_lc = keyword.lower() if keyword else None
+
+    def _build_gemini_model(self, api_key):
+        """Create a Gemini model bound to its own API key."""
+        model = genai.GenerativeModel('gemini-1.5-flash') # Use the latest efficient model
+        # GenerativeModel takes no api_key; it falls back to the client from the global
+        # genai.configure() only when no client of its own has been set
+        model._client = glm.GenerativeServiceClient(client_options={'api_key': api_key})
+        return model
+
+    def _pick_api_key(self, exclude=(), block=True):
+        """Take a request token from the usable API key with the most tokens left.
+
+        Keys in exclude are skipped. Unless block is False, waits for a refill when every usable key
+        is out of tokens and for the earliest cooldown to end when the remaining keys are cooling
+        down. Returns (key index, model), or None when no key can be used.
+        """
+        while not self.bot_should_stop:
+            now = time.monotonic()
+            candidates = [i for i in range(len(self._models)) if i not in exclude]
+            if not candidates: return None
+            usable = [i for i in candidates if self._api_key_cooldown_until[i] <= now]
+            for index in sorted(usable, key=lambda i: self._api_key_buckets[i].tokens, reverse=True):
+                if self._api_key_buckets[index].consume():
+                    return index, self._models[index]
+            if not block: return None
+            waits = [self._api_key_buckets[i].time_until_available() for i in usable]
+            waits += [self._api_key_cooldown_until[i] - now for i in candidates if i not in usable]
+            time.sleep(min(min(waits), 1.0)) # Short slices so a stop request is noticed
+        return None
+
+    def _cool_down_api_key(self, index):
+        """Take an API key out of the rotation after a critical error."""
+        log.warning(f"🚨 Critical API error with Key #{index + 1}. Cooling down for {self.api_key_cooldown_seconds}s.")
+        with self._api_key_lock:
+            self._api_key_cooldown_until[index] = time.monotonic() + self.api_key_cooldown_seconds
 
     def detect_language(self, text):
         """Detect if text is primarily English or Korean"""
         if not text:
             return 'korean'
-        clean_text = re.sub(r'http\S+|www\S+|@\w+|#\w+', '', text)
-        clean_text = re.sub(r'[^\w\s]', '', clean_text)
-        korean_chars = len(re.findall(r'[가-힣]', clean_text))
-        english_chars = len(re.findall(r'[a-zA-Z]', clean_text))
+        korean_chars = english_chars = 0
+        for char in _STRIP_RE.sub('', text):
+            if '가' <= char <= '힣':
+                korean_chars += 1
+            elif 'a' <= char <= 'z' or 'A' <= char <= 'Z':
+                english_chars += 1
         total_chars = korean_chars + english_chars
         if total_chars == 0:
             return 'korean'
@@ -129,8 +405,14 @@ class TwitterBot:
             chrome_options.add_experimental_option('excludeSwitches', ['enable-automation'])
             chrome_options.add_experimental_option('useAutomationExtension', False)
             chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+            # Return from driver.get() at DOMContentLoaded; explicit waits cover the elements we need
+            chrome_options.page_load_strategy = 'eager'
             self.driver = webdriver.Chrome(options=chrome_options)
             self.wait = WebDriverWait(self.driver, 20)
+            try:
+                self.driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': _TWEET_OBSERVER_JS})
+            except Exception as e:
+                print(f"⚠️ Tweet observer unavailable, falling back to full feed scans: {e}")
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             print("Opening Twitter...")
             self.driver.get("https://twitter.com")
@@ -160,9 +442,17 @@ class TwitterBot:
             print(f"Error clearing login data: {e}")
             return False
 
+    def _next_uniform(self, low, high):
+        """Draw a uniform value in [low, high] from the pre-sampled pool, refilling it when empty."""
+        unit = next(self._uniform_pool, None)
+        if unit is None:
+            self._uniform_pool = iter([self._rng.random() for _ in range(1024)])
+            unit = next(self._uniform_pool)
+        return low + (high - low) * unit
+
     def random_delay(self, min_seconds=0.05, max_seconds=0.15):
         """Add random delay to simulate human behavior"""
-        time.sleep(random.uniform(min_seconds, max_seconds))
+        time.sleep(self._next_uniform(min_seconds, max_seconds))
 
     # --- [MODIFIED] Typing speed update for 1500-2000 CPM ---
     def update_typing_speed(self):
@@ -196,7 +486,13 @@ class TwitterBot:
             actions.perform()
             self.random_delay(0.1, 0.3)
         except Exception as e:
-            print(f"Error simulating mouse movement: {str(e)}")
+            log.warning(f"Error simulating mouse movement: {str(e)}")
+
+    def _send_chunk(self, element, chunk, delay):
+        """Send a run of characters in one WebDriver call, then wait out their typing time"""
+        if chunk:
+            element.send_keys(''.join(chunk))
+            time.sleep(delay)
 
     # --- [MODIFIED] Human-like typing with faster speed and enhanced humanization ---
     def type_like_human(self, element, text):
@@ -206,40 +502,44 @@ class TwitterBot:
             self.random_delay(0.2, 0.5)
             self.current_typing_speed = random.uniform(0.03, 0.04) # Set initial speed for this text
             self.typing_rhythm_changes = 0
+            # Characters are batched into a single send_keys per run; the sleep after
+            # each batch is the sum of the per-character delays
+            chunk, chunk_delay = [], 0.0
+            # Increased typo and "thinking pause" chances, decided up front for the whole text
+            typo_positions = _sample_positions(len(text), 0.035, start=1)
+            pause_positions = _sample_positions(len(text), 0.025)
             for i, char in enumerate(text):
-                # Increased typo chance for more human-like fast typing
-                if random.random() < 0.035 and i > 0:
+                if i in typo_positions:
+                    self._send_chunk(element, chunk, chunk_delay)
+                    chunk, chunk_delay = [], 0.0
                     wrong_char = random.choice('qwertyuiopasdfghjklzxcvbnm')
                     element.send_keys(wrong_char)
                     time.sleep(self.get_dynamic_typing_delay())
                     element.send_keys(Keys.BACKSPACE)
                     time.sleep(self.get_dynamic_typing_delay())
                 
-                element.send_keys(char)
-                
-                if char == ' ':
-                    delay = self.get_dynamic_typing_delay('space')
-                elif char in '.,!?':
-                    delay = self.get_dynamic_typing_delay('punctuation')
-                elif char in '\n':
-                    delay = self.get_dynamic_typing_delay('newline')
-                else:
-                    delay = self.get_dynamic_typing_delay('normal')
-                time.sleep(delay)
-
-                # Increased "thinking pause" chance
-                if random.random() < 0.025:
-                    time.sleep(random.uniform(0.2, 0.5))
+                char_type = _CHAR_KIND.get(char, 'normal')
+                chunk.append(char)
+                chunk_delay += self.get_dynamic_typing_delay(char_type)
+
+                thinking_pause = i in pause_positions
+                if char_type != 'normal' or thinking_pause or len(chunk) >= 20:
+                    self._send_chunk(element, chunk, chunk_delay)
+                    chunk, chunk_delay = [], 0.0
+                    if thinking_pause:
+                        time.sleep(random.uniform(0.2, 0.5))
+            self._send_chunk(element, chunk, chunk_delay)
             self.random_delay(0.2, 0.4)
         except Exception as e:
-            print(f"Error in human-like typing: {str(e)}")
+            log.warning(f"Error in human-like typing: {str(e)}")
             element.clear()
             element.send_keys(text)
 
     def human_like_click(self, element):
         """Click element in a human-like way"""
         try:
-            self.simulate_mouse_movement(element)
+            # Hovering costs an extra WebDriver round trip, so only do it some of the time
+            if random.random() < 0.3: self.simulate_mouse_movement(element)
             self.random_delay(0.1, 0.3)
             try:
                 element.click()
@@ -248,13 +548,13 @@ class TwitterBot:
             self.random_delay(0.2, 0.5)
             return True
         except Exception as e:
-            print(f"Error in human-like click: {str(e)}")
+            log.warning(f"Error in human-like click: {str(e)}")
             return False
 
-    def simulate_reading_behavior(self, tweet_element):
+    def simulate_reading_behavior(self, tweet_element, tweet_text=None):
         """Simulate reading the tweet before replying - HYPER SPEED version"""
         try:
-            tweet_text = self.get_tweet_text(tweet_element)
+            if tweet_text is None: tweet_text = self.get_tweet_text(tweet_element)
             if tweet_text:
                 words = len(tweet_text.split())
                 reading_time = (words / 350) * 60
@@ -263,24 +563,85 @@ class TwitterBot:
         except Exception:
             time.sleep(random.uniform(0.3, 0.7))
 
+    def mark_tweet_processed(self, tweet_id):
+        """Append a single processed tweet ID to the persistence log"""
+        try:
+            if self._processed_log is None:
+                self._processed_log = open(self.processed_tweets_file, 'a', buffering=1)
+            self._processed_log.write(json.dumps(tweet_id) + '\n')
+            self.processed_log_lines += 1
+        except Exception as e:
+            log.warning(f"Error saving processed tweet: {str(e)}")
+
+    def _remember_processed(self, tweet_id):
+        """Record a processed tweet in memory and in the persistence log."""
+        self.processed_tweets[tweet_id] = True
+        self.processed_tweets.move_to_end(tweet_id)
+        if len(self.processed_tweets) > MAX_PROCESSED_TWEETS:
+            self.processed_tweets.popitem(last=False)
+        self.mark_tweet_processed(tweet_id)
+        if self.processed_log_lines > 1000:
+            self.save_processed_tweets(self.processed_tweets)
+
+    def _close_processed_log(self):
+        if self._processed_log is not None:
+            self._processed_log.close()
+            self._processed_log = None
+
     def save_processed_tweets(self, processed_tweets):
-        """Save processed tweets to file for persistence"""
+        """Compact the persistence log down to the given processed tweets; returns whether it was written"""
         try:
-            with open(self.processed_tweets_file, 'w') as f:
-                json.dump(list(processed_tweets), f)
+            self._close_processed_log()
+            # Only finished tweets are persisted; in-flight claims (False) are not
+            done = [tweet_id for tweet_id, finished in processed_tweets.items() if finished]
+            # Write a temp file and swap it in so a crash never leaves a half-written log
+            tmp_file = self.processed_tweets_file + '.tmp'
+            with open(tmp_file, 'w') as f:
+                f.writelines(json.dumps(tweet_id) + '\n' for tweet_id in done)
+            os.replace(tmp_file, self.processed_tweets_file)
+            self.processed_log_lines = len(done)
+            return True
         except Exception as e:
-            print(f"Error saving processed tweets: {str(e)}")
+            log.warning(f"Error saving processed tweets: {str(e)}")
+            return False
 
     def load_processed_tweets(self):
         """Load processed tweets from file"""
         try:
             with open(self.processed_tweets_file, 'r') as f:
-                return set(json.load(f))
+                lines = [line for line in f.read().splitlines() if line.strip()]
+            try:
+                # One parser call for the whole log instead of one json.loads per line
+                processed_tweets = json.loads('[' + ','.join(lines) + ']')
+            except ValueError:
+                # A crash mid-append can leave a partial last line; keep every line that parses
+                processed_tweets = []
+                for line in lines:
+                    try: processed_tweets.append(json.loads(line))
+                    except ValueError: pass
+            self.processed_log_lines = len(processed_tweets)
+            return OrderedDict.fromkeys(map(_status_id, processed_tweets[-MAX_PROCESSED_TWEETS:]), True)
         except FileNotFoundError:
-            return set()
+            return self._migrate_legacy_processed_tweets()
         except Exception as e:
             print(f"Error loading processed tweets: {str(e)}")
-            return set()
+            return OrderedDict()
+
+    def _migrate_legacy_processed_tweets(self):
+        """Import processed tweets from the old single-array JSON file, if present"""
+        try:
+            with open(self.legacy_processed_tweets_file, 'r') as f:
+                processed_tweets = OrderedDict.fromkeys(map(_status_id, json.load(f)[-MAX_PROCESSED_TWEETS:]), True)
+        except FileNotFoundError:
+            return OrderedDict()
+        except Exception as e:
+            print(f"Error loading legacy processed tweets: {str(e)}")
+            return OrderedDict()
+        # Keep the legacy file until its IDs are safely in the new log
+        if self.save_processed_tweets(processed_tweets):
+            try: os.remove(self.legacy_processed_tweets_file)
+            except OSError as e: print(f"Error removing legacy processed tweets file: {str(e)}")
+        return processed_tweets
 
     def save_cookies(self):
         """Save cookies to file"""
@@ -302,6 +663,46 @@ class TwitterBot:
             print(f"Error loading cookies: {e}")
             return False
 
+    def _wait_for_url_contains(self, fragment, timeout=10):
+        """Wait until the current URL contains the given fragment"""
+        try:
+            return WebDriverWait(self.driver, timeout).until(EC.url_contains(fragment))
+        except TimeoutException:
+            return False
+
+    def _wait_for_tweets(self, timeout=10):
+        """Wait until at least one tweet is rendered on the page"""
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located(TWEET_LOC))
+            return True
+        except TimeoutException:
+            return False
+
+    def _wait_for_logged_in(self, timeout=10, fail_on_login_page=True):
+        """Wait until the logged-in navigation bar shows up.
+
+        With fail_on_login_page, returns False as soon as Twitter redirects to the login flow.
+        """
+        def settled(driver):
+            url = driver.current_url.lower()
+            if 'login' not in url and 'flow' not in url and driver.find_elements(*HOME_LINK_LOC):
+                return 'logged_in'
+            if fail_on_login_page and ('login' in url or 'flow' in url):
+                return 'logged_out'
+            return False
+        try:
+            return WebDriverWait(self.driver, timeout).until(settled) == 'logged_in'
+        except TimeoutException:
+            return False
+
+    def _open_monitoring_page(self):
+        """Navigate to the page that will be monitored after login"""
+        if self.search_mode and self.current_keyword: return self.search_by_keyword(self.current_keyword)
+        if self.community_url: self.driver.get(self.community_url)
+        elif "home" not in self.driver.current_url.lower(): self.driver.get('https://x.com/home')
+        self._wait_for_tweets()
+        return True
+
     def search_by_keyword(self, keyword):
         """Search for tweets with specific keyword"""
         try:
@@ -309,8 +710,8 @@ class TwitterBot:
             search_url = f"https://x.com/search?q={encoded_keyword}&src=typed_query&f=live"
             print(f"Searching for keyword: '{keyword}' at {search_url}")
             self.driver.get(search_url)
-            time.sleep(5)
-            if "search" in self.driver.current_url.lower():
+            if self._wait_for_url_contains("search"):
+                self._wait_for_tweets()
                 print(f"✅ Successfully navigated to search results for: '{keyword}'")
                 return True
             else:
@@ -320,22 +721,24 @@ class TwitterBot:
             print(f"❌ Error searching for keyword '{keyword}': {str(e)}")
             return False
 
-    def contains_keyword(self, tweet_text, keyword):
-        """Check if tweet contains the specified keyword (case insensitive)"""
-        return keyword.lower() in tweet_text.lower() if tweet_text and keyword else False
+    def matches_search_keyword(self, tweet_text):
+        """Check if tweet passes the search keyword filter (case insensitive); always true outside search mode"""
+        if not (self.search_mode and self._current_keyword_lc): return True
+        return bool(tweet_text) and self._current_keyword_lc in tweet_text.lower()
 
     def ensure_keywords_included(self, text, language):
         """Ensure all required keywords are included in the response"""
-        if not self.required_keywords:
+        if not self.required_keywords or self._all_kw_re.match(text):
             return text
-        missing_keywords = [kw for kw in self.required_keywords if kw.lower() not in text.lower()]
+        found = self._required_kw_re.match(text).groups()
+        missing_keywords = [kw for kw, match in zip(self.required_keywords, found) if match is None]
         if missing_keywords:
-            print(f"⚠️ Missing keywords detected: {missing_keywords}")
+            log.warning(f"⚠️ Missing keywords detected: {missing_keywords}")
             if language == 'english':
                 text += f" Also, talking about {', '.join(missing_keywords)}."
             else:
                 text += f" {' '.join(missing_keywords)}"
-            print(f"✅ Added missing keywords.")
+            log.info(f"✅ Added missing keywords.")
         return text
 
     def login(self):
@@ -343,58 +746,46 @@ class TwitterBot:
         print("🚀 Starting login sequence...")
         try:
             self.driver.get("https://x.com/home")
-            time.sleep(5)
-            if "login" not in self.driver.current_url.lower() and "flow" not in self.driver.current_url.lower():
+            if self._wait_for_logged_in():
                 print("✅ Already logged in via Chrome profile session!")
-                if self.search_mode and self.current_keyword: return self.search_by_keyword(self.current_keyword)
-                elif self.community_url: self.driver.get(self.community_url); time.sleep(3)
-                return True
+                return self._open_monitoring_page()
         except Exception as e:
             print(f"Error during session check: {e}. Proceeding with login attempts.")
 
         try:
             self.driver.get("https://x.com")
-            time.sleep(2)
             if self.load_cookies():
                 print("🍪 Cookies loaded from file. Refreshing page...")
                 self.driver.refresh()
-                time.sleep(5)
-                if "login" not in self.driver.current_url.lower() and "flow" not in self.driver.current_url.lower():
+                if self._wait_for_logged_in():
                     print("✅ Successfully logged in with saved cookies!")
-                    if self.search_mode and self.current_keyword: return self.search_by_keyword(self.current_keyword)
-                    elif self.community_url: self.driver.get(self.community_url); time.sleep(3)
-                    return True
+                    return self._open_monitoring_page()
             print("🍪 Login with saved cookies failed or no cookies found.")
         except Exception as e:
             print(f"Login with saved cookies failed: {e}. Proceeding to manual login.")
 
         try:
             self.driver.get('https://x.com/i/flow/login')
-            time.sleep(5)
-            username_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'input[autocomplete="username"]')))
+            username_input = self.wait.until(EC.presence_of_element_located(USERNAME_INPUT_LOC))
             self.type_like_human(username_input, self.username)
-            self.human_like_click(self.wait.until(EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Next')]"))))
+            self.human_like_click(self.wait.until(EC.element_to_be_clickable(NEXT_BUTTON_LOC)))
             print("Username entered.")
-            time.sleep(3)
             try:
-                password_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'input[name="password"]')))
+                password_input = self.wait.until(EC.presence_of_element_located(PASSWORD_INPUT_LOC))
                 self.type_like_human(password_input, self.password)
-                self.human_like_click(self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'div[data-testid="LoginForm_Login_Button"]'))))
+                self.human_like_click(self.wait.until(EC.element_to_be_clickable(LOGIN_BUTTON_LOC)))
                 print("Password entered.")
-                time.sleep(7)
             except TimeoutException:
                 print("⚠️ Password field not found. Trying verification step...")
-                verification_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'input[data-testid="ocfEnterTextTextInput"]')))
+                verification_input = self.wait.until(EC.presence_of_element_located(VERIFICATION_INPUT_LOC))
                 self.type_like_human(verification_input, self.username)
                 verification_input.send_keys(Keys.RETURN)
-                time.sleep(3)
-                password_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'input[name="password"]')))
+                password_input = self.wait.until(EC.presence_of_element_located(PASSWORD_INPUT_LOC))
                 self.type_like_human(password_input, self.password)
-                self.human_like_click(self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, 'div[data-testid="LoginForm_Login_Button"]'))))
+                self.human_like_click(self.wait.until(EC.element_to_be_clickable(LOGIN_BUTTON_LOC)))
                 print("Password entered after verification.")
-                time.sleep(7)
 
-            if "login" in self.driver.current_url.lower() or "flow" in self.driver.current_url.lower():
+            if not self._wait_for_logged_in(timeout=15, fail_on_login_page=False):
                 print("❌ Manual login failed.")
                 self.driver.save_screenshot("manual_login_failed.png")
                 return False
@@ -402,11 +793,7 @@ class TwitterBot:
             print("✅ Manual login successful!")
             self.save_cookies()
             print("🍪 New session cookies saved.")
-            if self.search_mode and self.current_keyword: return self.search_by_keyword(self.current_keyword)
-            elif self.community_url: self.driver.get(self.community_url)
-            else: self.driver.get('https://x.com/home')
-            time.sleep(5)
-            return True
+            return self._open_monitoring_page()
         except Exception as e:
             print(f"❌ An unexpected error occurred during manual login: {e}")
             self.driver.save_screenshot("manual_login_error.png")
@@ -415,206 +802,281 @@ class TwitterBot:
     def get_tweet_text(self, tweet_element):
         """Extract text content from a tweet"""
         try:
-            return tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="tweetText"]').text
+            return tweet_element.find_element(*TWEET_TEXT_LOC).text
         except: return None
 
     def get_tweet_id(self, tweet_element):
-        """Extract unique identifier for a tweet, handling stale elements."""
+        """Extract the numeric status ID of a tweet in a single script call."""
         try:
-            for _ in range(3):
-                try:
-                    time_element = tweet_element.find_element(By.CSS_SELECTOR, 'time')
-                    return time_element.find_element(By.XPATH, '..').get_attribute('href')
-                except StaleElementReferenceException:
-                    time.sleep(0.5)
-                    continue
-            return None
+            return self.driver.execute_script(
+                "return arguments[0].querySelector('time')?.parentElement?.getAttribute('href')?.match(/\\/status\\/(\\d+)/)?.[1] || null;",
+                tweet_element,
+            )
         except: return None
 
-    def is_own_tweet(self, tweet_element):
-        """Check if the tweet is from our own account"""
-        try:
-            username_text = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="User-Name"]').text.lower()
-            return os.getenv('TWITTER_USERNAME', '').lower() in username_text
-        except: return True
-
-    def is_reply_tweet(self, tweet_element):
-        """Check if the tweet is a reply"""
-        try:
-            return len(tweet_element.find_elements(By.CSS_SELECTOR, '[data-testid="socialContext"]')) > 0
-        except: return True
-
     def clean_text(self, text):
         """Clean text to ensure it only contains supported characters"""
         if not text: return "..."
-        cleaned = ''.join(char for char in text if ord(char) < 128 or 0xAC00 <= ord(char) <= 0xD7A3)
-        return cleaned.strip() or "..."
+        return _UNSUPPORTED_CHARS_RE.sub('', text).strip() or "..."
 
     def _generate_with_retry(self, prompt):
-        """Internal helper to generate content with API key rotation."""
-        initial_key_index = self.current_api_key_index
-        for _ in range(len(self.gemini_api_keys)):
+        """Internal helper to generate content with API key rotation.
+
+        Each key is tried at most once. A slow request is hedged with the next ready key and the
+        first successful response wins.
+        """
+        pending = {}
+        tried = set()
+
+        def launch(block):
+            picked = self._pick_api_key(exclude=tried, block=block)
+            if picked is None: return
+            key_index, model = picked
+            tried.add(key_index)
+            pending[self._gemini_pool.submit(model.generate_content, prompt)] = key_index
+
+        launch(block=True)
+        while pending:
             if self.bot_should_stop: return None
-            try:
-                response = self.model.generate_content(prompt)
-                return response.text.strip().strip('"')
-            except Exception as e:
-                error_str = str(e).lower()
-                is_critical = any(k in error_str for k in ['quota', 'billing', '429', 'api key', 'permission denied'])
-                if is_critical:
-                    if not self.switch_to_next_api_key(): return None
-                    if self.current_api_key_index == initial_key_index:
-                        self.bot_should_stop = True
-                        return None
-                else:
-                    print(f"❌ Non-critical API error: {e}")
-                    return None
+            done, _ = wait(pending, timeout=self.gemini_hedge_seconds, return_when=FIRST_COMPLETED)
+            if not done:
+                launch(block=False)
+                continue
+            for future in done:
+                key_index = pending.pop(future)
+                try:
+                    text = future.result().text.strip().strip('"')
+                    for other in pending: other.cancel()
+                    return text
+                except Exception as e:
+                    if _CRITICAL_API_ERROR_RE.search(str(e).lower()):
+                        self._cool_down_api_key(key_index)
+                        if not pending: launch(block=True)
+                    else:
+                        log.warning(f"❌ Non-critical API error: {e}")
+                        if not pending: return None
+        if self.bot_should_stop: return None
+        log.warning("🛑 All API keys failed. Stopping bot.")
         self.bot_should_stop = True
         return None
 
+    def _generate_with_keywords(self, prompt, language):
+        """Generate and clean text, regenerating up to KEYWORD_ATTEMPTS times until all required keywords appear."""
+        text = None
+        for attempt in range(KEYWORD_ATTEMPTS):
+            generated = self._generate_with_retry(prompt)
+            if not generated: break
+            text = self.clean_text(generated) if language == 'korean' else generated.strip()
+            if self._all_kw_re is None or self._all_kw_re.match(text): return text
+            log.info(f"🔁 Generated text is missing required keywords (attempt {attempt + 1}/{KEYWORD_ATTEMPTS}).")
+        return self.ensure_keywords_included(text, language) if text else None
+
     def generate_ai_response(self, tweet_text):
         """Generate a contextual response."""
         detected_language = self.detect_language(tweet_text)
-        keywords_text = f"\n\nIMPORTANT: You must naturally include these keywords: {', '.join(self.required_keywords)}" if self.required_keywords else ""
-        prompt = f"{self.system_prompt}\n\n트윗 내용: \"{tweet_text}\"{keywords_text}\n\n너의 한국어 답변:"
-        if detected_language == 'english':
-            prompt = f"""You are a friendly 20-something Korean guy commenting on Twitter. Respond in casual English to this tweet. Tweet: "{tweet_text}"{keywords_text}\n\nYour English reply:"""
+        template = _REPLY_PROMPT_EN if detected_language == 'english' else self._reply_prompt_kr
+        prompt = template.format(tweet_text=tweet_text, keywords_text=self._keywords_prompt)
         
-        ai_reply = self._generate_with_retry(prompt)
+        ai_reply = self._generate_with_keywords(prompt, detected_language)
         if ai_reply:
-            ai_reply = self.clean_text(ai_reply) if detected_language == 'korean' else ai_reply.strip()
-            ai_reply = self.ensure_keywords_included(ai_reply, detected_language)
-            print(f"Generated AI response ({detected_language}, {len(ai_reply)} chars): {ai_reply}")
+            log.info(f"Generated AI response ({detected_language}, {len(ai_reply)} chars): {ai_reply}")
             return ai_reply
         return None
 
     def generate_quote_text(self, tweet_text):
         """Generate quote tweet text."""
         detected_language = self.detect_language(tweet_text)
-        keywords_text = f"\n\nIMPORTANT: You must naturally include these keywords: {', '.join(self.required_keywords)}" if self.required_keywords else ""
-        quote_prompt_base = os.getenv('GEMINI_QUOTE_PROMPT', self.system_prompt)
-        prompt = f"{quote_prompt_base}\n\n인용할 트윗 내용: \"{tweet_text}\"{keywords_text}\n\n너의 한국어 인용 코멘트:"
-        if detected_language == 'english':
-            prompt = f"""You are a friendly 20-something Korean guy quoting a tweet. Write a casual English comment for this tweet. Tweet to quote: "{tweet_text}"{keywords_text}\n\nYour English quote comment:"""
+        template = _QUOTE_PROMPT_EN if detected_language == 'english' else self._quote_prompt_kr
+        prompt = template.format(tweet_text=tweet_text, keywords_text=self._keywords_prompt)
             
-        quote_text = self._generate_with_retry(prompt)
+        quote_text = self._generate_with_keywords(prompt, detected_language)
         if quote_text:
-            quote_text = self.clean_text(quote_text) if detected_language == 'korean' else quote_text.strip()
-            quote_text = self.ensure_keywords_included(quote_text, detected_language)
-            print(f"Generated quote text ({detected_language}, {len(quote_text)} chars): {quote_text}")
+            log.info(f"Generated quote text ({detected_language}, {len(quote_text)} chars): {quote_text}")
             return quote_text
         return None
 
+    def prefetch_responses(self, tweet_id, tweet_text):
+        """Start generating the reply and quote text for a tweet in the background."""
+        if not tweet_id or not tweet_text or tweet_id in self._prefetched: return
+        if not self.matches_search_keyword(tweet_text): return
+        self._prefetched[tweet_id] = {
+            'reply': self._ai_executor.submit(self.generate_ai_response, tweet_text),
+            'quote': self._ai_executor.submit(self.generate_quote_text, tweet_text),
+        }
+
+    def _take_prefetched(self, kind, tweet_id, tweet_text):
+        """Return the prefetched reply/quote text for a tweet, generating it now if none was started."""
+        future = self._prefetched.get(tweet_id, {}).pop(kind, None)
+        if future: return future.result()
+        return self.generate_ai_response(tweet_text) if kind == 'reply' else self.generate_quote_text(tweet_text)
+
+    async def _wait_prefetched(self, kind, tweet_id):
+        """Wait for a prefetched reply/quote to finish without taking it."""
+        future = self._prefetched.get(tweet_id, {}).get(kind)
+        if future: await asyncio.wait([asyncio.wrap_future(future)])
+
+    def discard_prefetched(self, tweet_id):
+        """Drop any prefetched text for a tweet that no longer needs it."""
+        for future in self._prefetched.pop(tweet_id, {}).values():
+            future.cancel()
+
     def like_tweet(self, tweet_element):
         """Like a tweet."""
         try:
-            like_button = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="like"]')
-            if self.human_like_click(like_button): print("✅ Tweet liked successfully!")
+            like_button = tweet_element.find_element(*LIKE_BUTTON_LOC)
+            self.random_delay(0.1, 0.3)
+            like_button.click()
+            log.info("✅ Tweet liked successfully!")
         except: pass
 
     def retweet_tweet(self, tweet_element):
         """Retweet a tweet."""
         try:
-            retweet_button = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="retweet"]')
-            if self.human_like_click(retweet_button):
-                retweet_option = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, '[data-testid="retweetConfirm"]')))
-                if self.human_like_click(retweet_option): print("✅ Tweet retweeted successfully!")
+            retweet_button = tweet_element.find_element(*RETWEET_BUTTON_LOC)
+            self.random_delay(0.1, 0.3)
+            retweet_button.click()
+            retweet_option = self.wait.until(EC.element_to_be_clickable(RETWEET_CONFIRM_LOC))
+            self.random_delay(0.1, 0.3)
+            retweet_option.click()
+            log.info("✅ Tweet retweeted successfully!")
         except: pass
 
-    def quote_tweet(self, tweet_element, tweet_text):
-        """Create a quote tweet."""
+    def _find_tweet_by_id(self, tweet_id):
+        """Find the tweet article whose status link ends with the given status ID, or None."""
+        return self.driver.execute_script(
+            "return document.querySelector(arguments[0])?.closest('article[data-testid=\"tweet\"]') || null;",
+            f'a[href$="/status/{tweet_id}"]',
+        )
+
+    def quote_tweet(self, tweet_element, tweet_id=None, tweet_text=None):
+        """Create a quote tweet. ID and text are read from the element unless given."""
         try:
-            quote_text = self.generate_quote_text(tweet_text)
-            if not quote_text or self.bot_should_stop: return False
-            
-            tweet_id = self.get_tweet_id(tweet_element)
+            if tweet_id is None: tweet_id = self.get_tweet_id(tweet_element)
+            if tweet_text is None: tweet_text = self.get_tweet_text(tweet_element)
             if not tweet_id: return False
             
-            fresh_tweet_element = self.wait.until(EC.presence_of_element_located((By.XPATH, f'//a[contains(@href, "{tweet_id.split("/")[-1]}")]/ancestor::article[@data-testid="tweet"]')))
+            quote_text = self._take_prefetched('quote', tweet_id, tweet_text)
+            if not quote_text or self.bot_should_stop: return False
             
-            quote_button = fresh_tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="retweet"]')
+            fresh_tweet_element = self.wait.until(lambda d: self._find_tweet_by_id(tweet_id))
+            
+            quote_button = fresh_tweet_element.find_element(*RETWEET_BUTTON_LOC)
             self.human_like_click(quote_button)
             
-            quote_option = self.wait.until(EC.element_to_be_clickable((By.XPATH, "//span[contains(text(), 'Quote') or contains(text(), '인용')]")))
+            quote_option = self.wait.until(EC.element_to_be_clickable(QUOTE_OPTION_LOC))
             self.human_like_click(quote_option)
             
-            quote_text_area = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]')))
+            quote_text_area = self.wait.until(EC.presence_of_element_located(TWEET_TEXTAREA_LOC))
             self.type_like_human(quote_text_area, quote_text)
             
-            quote_submit_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, '[data-testid="tweetButton"]')))
+            quote_submit_button = self.wait.until(EC.element_to_be_clickable(TWEET_BUTTON_LOC))
             self.human_like_click(quote_submit_button)
             
-            WebDriverWait(self.driver, 10).until(EC.invisibility_of_element_located((By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]')))
-            print("✅ Quote tweet posted successfully!")
+            WebDriverWait(self.driver, 10).until(EC.invisibility_of_element_located(TWEET_TEXTAREA_LOC))
+            log.info("✅ Quote tweet posted successfully!")
             return True
         except Exception as e:
-            print(f"❌ Error creating quote tweet: {str(e)}")
+            log.warning(f"❌ Error creating quote tweet: {str(e)}")
             try:
                 ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
             except: pass
             return False
 
-    def reply_to_tweet(self, tweet_element):
-        """Reply to a specific tweet."""
+    def reply_to_tweet(self, tweet_element, tweet_id=None, tweet_text=None):
+        """Reply to a specific tweet. ID and text are read from the element unless given."""
         try:
-            self.simulate_reading_behavior(tweet_element)
+            if tweet_text is None: tweet_text = self.get_tweet_text(tweet_element)
+            self.simulate_reading_behavior(tweet_element, tweet_text)
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", tweet_element)
             self.random_delay(0.5, 1)
 
-            tweet_id = self.get_tweet_id(tweet_element)
-            tweet_text = self.get_tweet_text(tweet_element)
+            if tweet_id is None: tweet_id = self.get_tweet_id(tweet_element)
             if not tweet_id or not tweet_text: return "PREP_FAILED"
-            if self.search_mode and self.current_keyword and not self.contains_keyword(tweet_text, self.current_keyword): return "PREP_FAILED"
+            if not self.matches_search_keyword(tweet_text): return "PREP_FAILED"
             
-            reply_text = self.generate_ai_response(tweet_text)
+            reply_text = self._take_prefetched('reply', tweet_id, tweet_text)
             if not reply_text or self.bot_should_stop: return "PREP_FAILED"
             
-            reply_button = tweet_element.find_element(By.CSS_SELECTOR, '[data-testid="reply"]')
+            reply_button = tweet_element.find_element(*REPLY_BUTTON_LOC)
             self.human_like_click(reply_button)
             
-            reply_box_selector = (By.CSS_SELECTOR, '[data-testid="tweetTextarea_0"]')
-            reply_box = self.wait.until(EC.presence_of_element_located(reply_box_selector))
+            reply_box = self.wait.until(EC.presence_of_element_located(TWEET_TEXTAREA_LOC))
             self.type_like_human(reply_box, reply_text)
             
-            submit_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, '[data-testid="tweetButton"]')))
+            submit_button = self.wait.until(EC.element_to_be_clickable(TWEET_BUTTON_LOC))
             self.human_like_click(submit_button)
             
-            print("Waiting for reply to be posted...")
+            log.info("Waiting for reply to be posted...")
             
             try:
-                WebDriverWait(self.driver, 10).until(EC.invisibility_of_element_located(reply_box_selector))
-                print("✅ Reply successfully posted.")
+                WebDriverWait(self.driver, 10).until(EC.invisibility_of_element_located(TWEET_TEXTAREA_LOC))
+                log.info("✅ Reply successfully posted.")
                 if random.random() < 0.8: self.like_tweet(tweet_element)
                 if random.random() < 0.5: self.retweet_tweet(tweet_element)
                 return "SUCCESS"
             except TimeoutException:
-                print("❌ Reply post failed!")
+                log.warning("❌ Reply post failed!")
                 try: ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
                 except: pass
                 return "POST_FAILED"
         except Exception as e:
-            print(f"❌ Error preparing or sending reply: {str(e)}")
+            log.warning(f"❌ Error preparing or sending reply: {str(e)}")
             try: ActionChains(self.driver).send_keys(Keys.ESCAPE).perform()
             except: pass
             return "PREP_FAILED"
 
     def scroll_feed(self, scroll_count=3):
-        """Scroll the feed to load more tweets."""
+        """Scroll the feed to load more tweets, stopping early once the page stops moving."""
+        last_position, unchanged = None, 0
         for _ in range(scroll_count):
-            self.driver.execute_script(f"window.scrollBy(0, {random.randint(500, 1000)})")
+            position = self.driver.execute_script(
+                "window.scrollBy(0, arguments[0]); return [window.scrollY, document.documentElement.scrollHeight];",
+                random.randint(500, 1000),
+            )
+            if position == last_position:
+                unchanged += 1
+                if unchanged >= 2: break
+            else:
+                unchanged = 0
+            last_position = position
 
     def get_all_visible_tweets(self):
-        """Get all currently visible tweets on the page."""
+        """Get (element, tweet ID, text) for visible tweets on the page that are not our own or replies."""
         try:
-            all_tweets = self.driver.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]')
-            return [t for t in all_tweets if t.is_displayed() and not self.is_own_tweet(t) and not self.is_reply_tweet(t)]
+            tweets = self.driver.execute_script(_TWEET_BATCH_JS, self._own_username_lc)
+            return [
+                (t['el'], t['id'], t['text']) for t in tweets
+                if t['id'] and t['visible'] and not t['own'] and not t['reply']
+            ]
         except: return []
 
-    # --- [MODIFIED] Main loop with randomized action order and delays ---
+    def _requeue_tweet(self, tweet_element):
+        """Put a tweet still on the page back on the in-page new-tweet queue for the next poll."""
+        try:
+            self.driver.execute_script("if (arguments[0].isConnected) window.__newTweets?.add(arguments[0]);", tweet_element)
+        except: pass
+
+    def _resolve_tweet(self, tweet_element, tweet_id):
+        """Return the tweet element, looking it up again by ID if the feed re-rendered it."""
+        try:
+            tweet_element.is_displayed()
+            return tweet_element
+        except StaleElementReferenceException:
+            return self._find_tweet_by_id(tweet_id)
+
+    async def _in_driver(self, func, *args):
+        """Run a blocking Selenium call on the driver thread without blocking the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._driver_executor, func, *args)
+
     def monitor_feed(self, interval=3):
         """Monitor the feed with randomized, human-like interaction patterns."""
-        processed_tweets = self.load_processed_tweets()
-        print(f"✅ Loaded {len(processed_tweets)} previously processed tweet IDs.")
+        asyncio.run(self.monitor_feed_async(interval))
+
+    # --- [MODIFIED] Main loop with randomized action order and delays ---
+    async def monitor_feed_async(self, interval=3):
+        """Monitor the feed: a poller queues new tweets and action workers, paced by the rate limiter, handle them."""
+        self.processed_tweets = self.load_processed_tweets()
+        print(f"✅ Loaded {len(self.processed_tweets)} previously processed tweet IDs.")
         
         location = "home feed"
         if self.search_mode: location = f"search results for '{self.current_keyword}'"
@@ -622,97 +1084,166 @@ class TwitterBot:
             
         print(f"🔍 Monitoring: {location}")
         print(f"🔄 API Key Rotation: Enabled with {len(self.gemini_api_keys)} key(s).")
+        print(f"⏱️ Action rate limit: {self.max_actions_per_minute} replies/quotes per minute.")
         if self.required_keywords: print(f"🎯 Required Keywords: {self.required_keywords}")
         
-        consecutive_no_new_tweets = 0
+        # Bind methods used on every iteration to locals once
+        in_driver, get_batch, prefetch, scroll, requeue = self._in_driver, self.get_all_visible_tweets, self.prefetch_responses, self.scroll_feed, self._requeue_tweet
+        reply, quote, wait_prefetched, resolve = self.reply_to_tweet, self.quote_tweet, self._wait_prefetched, self._resolve_tweet
+        processed, remember, discard = self.processed_tweets, self._remember_processed, self.discard_prefetched
+        limiter, uniform, getrandbits, sleep = self.action_limiter, self._next_uniform, self._rng.getrandbits, asyncio.sleep
+        poll_backoff_base, poll_backoff_cap = self.poll_backoff_base, self.poll_backoff_cap
         
-        while not self.bot_should_stop:
-            try:
-                tweets = self.get_all_visible_tweets()
-                new_tweets_found = False
-                
-                for tweet in tweets:
-                    if self.bot_should_stop: break
+        queue = asyncio.Queue(maxsize=self.tweet_queue_size)
+        # IDs and texts of queued tweets in queue order, so workers can look ahead for prefetching
+        pending = deque()
+        workers = self.action_workers
+        busy = 0
+        
+        async def release(tweet_id, tweet=None):
+            """Drop an in-flight claim. A given element still on the page is queued again in-page so
+            the next poll offers it; otherwise the tweet only comes back if the feed re-renders it."""
+            if processed.get(tweet_id) is False: del processed[tweet_id]
+            discard(tweet_id)
+            if tweet is not None: await in_driver(requeue, tweet)
+        
+        async def producer():
+            consecutive_no_new_tweets = 0
+            while not self.bot_should_stop:
+                try:
+                    tweets = await in_driver(get_batch)
+                    new_tweets_found = False
                     
-                    tweet_id = self.get_tweet_id(tweet)
-                    if not tweet_id or tweet_id in processed_tweets:
-                        continue
+                    # Processed IDs are only touched on the event loop thread, never from the driver thread
+                    for tweet, tweet_id, tweet_text in tweets:
+                        if self.bot_should_stop: break
+                        # setdefault checks and claims the tweet as in flight in one lookup; the dict
+                        # only grows for tweets that are neither processed nor already queued
+                        size = len(processed)
+                        processed.setdefault(tweet_id, False)
+                        if len(processed) == size:
+                            processed.move_to_end(tweet_id) # Keep tweets still on screen fresh in the LRU
+                            continue
                         
-                    new_tweets_found = True
-                    print(f"\nProcessing new tweet: {tweet_id}")
+                        new_tweets_found = True
+                        pending.append((tweet_id, tweet_text))
+                        await queue.put((tweet, tweet_id, tweet_text))
                     
-                    # --- [NEW FEATURE] Randomize action order ---
-                    actions = ["reply", "quote"]
-                    random.shuffle(actions)
-                    first_action_name, second_action_name = actions[0], actions[1]
-                    
-                    first_action_success = False
+                    if self.bot_should_stop: break
                     
-                    # --- Execute First Action ---
-                    print(f"🤖 First action: {first_action_name.capitalize()}")
-                    if first_action_name == "reply":
-                        status = self.reply_to_tweet(tweet)
-                        if status == "SUCCESS":
-                            first_action_success = True
-                    elif first_action_name == "quote":
-                        tweet_text = self.get_tweet_text(tweet)
-                        if tweet_text and self.quote_tweet(tweet, tweet_text):
-                            first_action_success = True
-
-                    # --- If First Action Succeeded, Proceed to Second ---
-                    if first_action_success:
-                        # --- [NEW FEATURE] Human-like delay between actions ---
-                        human_delay = round(random.uniform(1.0, 3.0), 3)
-                        print(f"⏳ Human-like pause for {human_delay} seconds...")
-                        time.sleep(human_delay)
-                        
-                        # --- Execute Second Action ---
-                        print(f"🤖 Second action: {second_action_name.capitalize()}")
-                        if second_action_name == "reply":
-                            self.reply_to_tweet(tweet) # We don't need to check status as the main job is done
-                        elif second_action_name == "quote":
-                            tweet_text = self.get_tweet_text(tweet)
-                            if tweet_text:
-                                self.quote_tweet(tweet, tweet_text)
-                        
-                        processed_tweets.add(tweet_id)
-                        print(f"✅ Full cycle completed for tweet: {tweet_id}")
-                        
-                        # Wait for the next cycle
-                        delay = random.uniform(10, 18)
-                        print(f"⚡ HYPER SPEED: Waiting {delay:.0f} seconds for the next tweet...")
-                        time.sleep(delay)
+                    if new_tweets_found:
+                        consecutive_no_new_tweets = 0
                     else:
-                        print(f"⚠️ First action ({first_action_name}) failed. Skipping tweet to avoid errors.")
-                        processed_tweets.add(tweet_id) # Add to processed to avoid retrying a failed tweet
+                        consecutive_no_new_tweets += 1
+                        # Scrolling while a worker is acting would move its tweet out from under it
+                        if queue.empty() and not busy:
+                            log.info(f"No new tweets found ({consecutive_no_new_tweets} consecutive times). Aggressively scrolling...")
+                            await in_driver(scroll, SCROLL_LUT[min(consecutive_no_new_tweets, 63)])
+                    
+                    poll_delay = min(poll_backoff_cap, interval * poll_backoff_base ** min(consecutive_no_new_tweets, 63))
+                    await sleep(poll_delay * uniform(0.5, 1.0))
+                    
+                except Exception as e:
+                    log.warning(f"An error occurred in the main loop: {str(e)}. Recovering...")
+                    if queue.empty() and not busy: await in_driver(scroll, 10)
+            
+            # Wake every worker so it can exit
+            for _ in range(workers): await queue.put(None)
+        
+        async def process(tweet, tweet_id, tweet_text):
+            log.info(f"\nProcessing new tweet: {tweet_id}")
+            
+            # The tweet may have waited in the queue while the feed re-rendered
+            tweet = await in_driver(resolve, tweet, tweet_id)
+            if tweet is None:
+                log.info(f"Tweet {tweet_id} is no longer on the page. Releasing it.")
+                await release(tweet_id)
+                return
+            
+            # --- [NEW FEATURE] Randomize action order ---
+            order = getrandbits(1)
+            first_action_name, second_action_name = ACTIONS[order], ACTIONS[1 - order]
+            
+            first_action_success = False
+            
+            # --- Execute First Action ---
+            log.info(f"🤖 First action: {first_action_name.capitalize()}")
+            # Wait for the generated text here rather than on the driver thread
+            await wait_prefetched(first_action_name, tweet_id)
+            if first_action_name == "reply":
+                async with limiter:
+                    status = await in_driver(reply, tweet, tweet_id, tweet_text)
+                if status == "SUCCESS":
+                    first_action_success = True
+            elif first_action_name == "quote":
+                if tweet_text:
+                    async with limiter:
+                        first_action_success = await in_driver(quote, tweet, tweet_id, tweet_text)
 
-                if self.bot_should_stop: break
+            # --- If First Action Succeeded, Proceed to Second ---
+            if first_action_success:
+                # --- [NEW FEATURE] Human-like delay between actions ---
+                human_delay = round(uniform(1.0, 3.0), 3)
+                log.info(f"⏳ Human-like pause for {human_delay} seconds...")
+                # Let the second action's text finish generating during the pause
+                await asyncio.gather(sleep(human_delay), wait_prefetched(second_action_name, tweet_id))
                 
-                if new_tweets_found:
-                    self.save_processed_tweets(processed_tweets)
-                    consecutive_no_new_tweets = 0
-                else:
-                    consecutive_no_new_tweets += 1
-                    print(f"No new tweets found ({consecutive_no_new_tweets} consecutive times). Aggressively scrolling...")
-                    self.scroll_feed(scroll_count=min(5 + consecutive_no_new_tweets, 15))
+                # --- Execute Second Action ---
+                log.info(f"🤖 Second action: {second_action_name.capitalize()}")
+                if second_action_name == "reply":
+                    async with limiter:
+                        await in_driver(reply, tweet, tweet_id, tweet_text) # We don't need to check status as the main job is done
+                elif second_action_name == "quote":
+                    if tweet_text:
+                        async with limiter:
+                            await in_driver(quote, tweet, tweet_id, tweet_text)
                 
-                if len(processed_tweets) > 300:
-                    processed_tweets = set(list(processed_tweets)[-300:])
-                    self.save_processed_tweets(processed_tweets)
-                
-                time.sleep(random.uniform(interval * 0.8, interval * 1.1))
-                
-            except Exception as e:
-                print(f"An error occurred in the main loop: {str(e)}. Recovering...")
-                self.scroll_feed(scroll_count=10)
+                remember(tweet_id)
+                discard(tweet_id)
+                log.info(f"✅ Full cycle completed for tweet: {tweet_id}")
+            else:
+                log.warning(f"⚠️ First action ({first_action_name}) failed. Skipping tweet to avoid errors.")
+                remember(tweet_id) # Add to processed to avoid retrying a failed tweet
+                discard(tweet_id)
+        
+        async def consumer():
+            nonlocal busy
+            while True:
+                item = await queue.get()
+                if item is None: break
+                tweet, tweet_id, tweet_text = item
+                pending.popleft()
+                if self.bot_should_stop:
+                    await release(tweet_id)
+                    continue
+                # Keep the AI workers busy with this tweet and the next two
+                prefetch(tweet_id, tweet_text)
+                for upcoming_id, upcoming_text in islice(pending, 2):
+                    prefetch(upcoming_id, upcoming_text)
+                busy += 1
+                try:
+                    await process(tweet, tweet_id, tweet_text)
+                except Exception as e:
+                    log.warning(f"An error occurred while processing tweet {tweet_id}: {str(e)}")
+                    await release(tweet_id, tweet)
+                finally:
+                    busy -= 1
+        
+        await asyncio.gather(producer(), *(consumer() for _ in range(workers)))
         
+        _log_buffer.flush()
         print("🔄 Final cleanup before shutdown...")
-        self.save_processed_tweets(processed_tweets)
+        self.save_processed_tweets(self.processed_tweets)
         print("✅ Processed tweets saved")
 
     def cleanup(self):
         """Close the browser and clean up"""
+        _log_buffer.flush()
         print("🧹 Cleaning up resources...")
+        self._ai_executor.shutdown(wait=False, cancel_futures=True)
+        self._gemini_pool.shutdown(wait=False, cancel_futures=True)
+        self._driver_executor.shutdown(wait=False, cancel_futures=True)
+        self._close_processed_log()
         if hasattr(self, 'driver'):
             self.driver.quit()
         print("✅ Cleanup completed")